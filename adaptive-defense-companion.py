@@ -6,10 +6,42 @@
 import os
 import re
 import time
+import atexit
 import json
+import hashlib
 import subprocess
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque
+
+# Use orjson for faster config serialization if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use RE2's linear-time matcher for log line parsing if available
+try:
+    import re2 as line_re
+except ImportError:
+    line_re = re
+
+# Use an Aho-Corasick automaton for known-service matching if available
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Use inotify to wake up on log writes instead of fixed sleeps if available
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+# Use NumPy for statistics over long series if available
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Configure paths
 BASE_DIR = "/data/data/com.termux/files/home/security_framework"
@@ -20,6 +52,20 @@ COUNTERMEASURE_CONFIG = f"{CONFIG_DIR}/countermeasures.json"
 LOG_DIR = f"{BASE_DIR}/logs"
 AI_LOG = f"{LOG_DIR}/ai_companion.log"
 
+# Read buffer size for tailing the watchdog log
+BUFFER_SIZE = 1 << 20
+
+# Series length from which NumPy reductions beat the pure-Python loop
+NUMPY_MIN_SAMPLES = 64
+
+# Substring length range considered for pattern detection
+NGRAM_MIN_LEN = 3
+NGRAM_MAX_LEN = 9
+
+# Per-service history limits (older events are dropped)
+KILL_HISTORY_LIMIT = 1024
+RESURRECTION_HISTORY_LIMIT = 256
+
 # Ensure directories exist
 os.makedirs(CONFIG_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -27,11 +73,45 @@ os.makedirs(LOG_DIR, exist_ok=True)
 class AdaptiveDefenseCompanion:
     def __init__(self, log_path=LOG_PATH):
         self.log_path = log_path
+        
+        # Keep the AI log open for the life of the process (line buffered)
+        self._ai_log_fp = open(AI_LOG, "a", buffering=1)
+        atexit.register(self._ai_log_fp.close)
+        
         self.known_patterns = self._load_patterns()
-        self.kill_history = defaultdict(list)
-        self.resurrection_patterns = defaultdict(list)
+        self._known_patterns_set = set(self.known_patterns["patterns"])
+        self._service_matcher = self._build_service_matcher()
+        self.kill_history = defaultdict(lambda: deque(maxlen=KILL_HISTORY_LIMIT))
+        self.resurrection_patterns = defaultdict(lambda: deque(maxlen=RESURRECTION_HISTORY_LIMIT))
         self.trigger_correlations = defaultdict(int)
-        self.last_processed_line = 0
+        self.last_offset = 0
+        self._total_kills = 0
+        self._total_resurrections = 0
+        self._pending_notes = []
+        self._last_patterns_digest = None
+        
+        # Incremental n-gram statistics for pattern detection
+        self._ngram_df = Counter()  # n-gram -> number of services containing it
+        self._ngram_candidates = set()  # n-grams eligible to become patterns
+        self._ngram_services = set()  # services already counted
+        
+        # Parsed countermeasures config, reloaded only when the file changes
+        self._existing_cm = []
+        self._existing_keys = set()
+        self._cm_mtime = -1
+        
+        # Log line parsers, compiled once
+        self._kill_re = line_re.compile(r'\[(.*?)\] \[KILL\] Terminated (.*?) \(PID:')
+        self._pattern_re = line_re.compile(r'Service (.*?) resurrected after (\d+) seconds')
+        self._trigger_re = line_re.compile(r'Service (.*?) resurrection correlated with (.*?)$')
+        
+        # Single pass over each line for the tag, then dispatch to its parser
+        self._tag_re = line_re.compile(r'\[(KILL|PATTERN|TRIGGER)\]')
+        self._line_handlers = {
+            "KILL": self._handle_kill,
+            "PATTERN": self._handle_pattern,
+            "TRIGGER": self._handle_trigger
+        }
         self.log("AI Companion initialized")
         
     def log(self, message):
@@ -39,8 +119,7 @@ class AdaptiveDefenseCompanion:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}"
         print(log_message)
-        with open(AI_LOG, "a") as f:
-            f.write(log_message + "\n")
+        self._ai_log_fp.write(log_message + "\n")
     
     def _load_patterns(self):
         """Load known patterns from configuration"""
@@ -66,18 +145,51 @@ class AdaptiveDefenseCompanion:
                         ".*Tracking.*"
                     ]
                 }
-                with open(PATTERN_CONFIG, "w") as f:
-                    json.dump(default_patterns, f, indent=2)
+                self._write_json(PATTERN_CONFIG, default_patterns)
                 return default_patterns
         except Exception as e:
             self.log(f"Error loading patterns: {e}")
             return {"services": [], "patterns": []}
     
+    def _build_service_matcher(self):
+        """Compile the known service names into a single multi-pattern matcher"""
+        services = self.known_patterns.get("services", [])
+        if ahocorasick is None or not services:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for service in services:
+            automaton.add_word(service, service)
+        automaton.make_automaton()
+        return automaton
+    
+    def match_service(self, line):
+        """Return the first known service name found in a line, or None"""
+        if self._service_matcher is not None:
+            hit = next(self._service_matcher.iter(line), None)
+            return hit[1] if hit else None
+        
+        for service in self.known_patterns.get("services", []):
+            if service in line:
+                return service
+        return None
+    
+    def _write_json(self, path, data):
+        """Write JSON atomically so readers never see a half-written file"""
+        tmp_path = f"{path}.tmp"
+        if orjson is not None:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(data, indent=2))
+        os.replace(tmp_path, path)
+    
     def _save_patterns(self):
         """Save updated patterns to configuration"""
         try:
-            with open(PATTERN_CONFIG, "w") as f:
-                json.dump(self.known_patterns, f, indent=2)
+            self._known_patterns_set = set(self.known_patterns["patterns"])
+            self._write_json(PATTERN_CONFIG, self.known_patterns)
             self.log(f"Saved updated patterns configuration with {len(self.known_patterns['patterns'])} patterns")
         except Exception as e:
             self.log(f"Error saving patterns: {e}")
@@ -89,87 +201,115 @@ class AdaptiveDefenseCompanion:
             return
             
         try:
-            with open(self.log_path, "r") as f:
-                lines = f.readlines()
+            # Start over if the log was rotated or truncated
+            if os.path.getsize(self.log_path) < self.last_offset:
+                self.last_offset = 0
             
-            # Process only new lines
-            new_lines = lines[self.last_processed_line:]
-            self.last_processed_line = len(lines)
+            # Process only new lines, seeking past everything already read
+            processed = 0
+            tag_search = self._tag_re.search
+            handlers = self._line_handlers
+            with open(self.log_path, "rb", buffering=BUFFER_SIZE) as f:
+                f.seek(self.last_offset)
+                for raw in f:
+                    # Leave a partially written line for the next pass
+                    if not raw.endswith(b"\n"):
+                        break
+                    self.last_offset += len(raw)
+                    processed += 1
+                    line = raw[:-1].decode("utf-8", "replace")
+                    
+                    tag = tag_search(line)
+                    if tag is not None:
+                        handlers[tag.group(1)](line)
             
-            if not new_lines:
+            if not processed:
                 return
                 
-            self.log(f"Processing {len(new_lines)} new log entries")
-                
-            # Extract kill events
-            for line in new_lines:
-                if "[KILL]" in line:
-                    # Extract service name and timestamp
-                    match = re.search(r'\[(.*?)\] \[KILL\] Terminated (.*?) \(PID:', line)
-                    if match:
-                        timestamp_str, service = match.groups()
-                        try:
-                            timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                            self.kill_history[service].append(timestamp)
-                        except Exception as e:
-                            self.log(f"Error parsing timestamp: {e}")
-                
-                elif "[PATTERN]" in line:
-                    # Extract resurrection patterns
-                    match = re.search(r'Service (.*?) resurrected after (\d+) seconds', line)
-                    if match:
-                        service, seconds = match.groups()
-                        self.resurrection_patterns[service].append(int(seconds))
-                
-                elif "[TRIGGER]" in line:
-                    # Extract trigger correlations
-                    match = re.search(r'Service (.*?) resurrection correlated with (.*?)$', line)
-                    if match:
-                        service, trigger = match.groups()
-                        self.trigger_correlations[f"{service}_{trigger}"] += 1
+            self.log(f"Processed {processed} new log entries")
             
-            self.log(f"Found {sum(len(kills) for kills in self.kill_history.values())} kill events, " + 
-                     f"{sum(len(res) for res in self.resurrection_patterns.values())} resurrection patterns, " +
+            self.log(f"Found {self._total_kills} kill events, " + 
+                     f"{self._total_resurrections} resurrection patterns, " +
                      f"{len(self.trigger_correlations)} trigger correlations")
                 
         except Exception as e:
             self.log(f"Error analyzing logs: {e}")
     
+    def _handle_kill(self, line):
+        """Extract service name and timestamp from a kill event"""
+        match = self._kill_re.search(line)
+        if match:
+            timestamp_str, service = match.groups()
+            try:
+                timestamp = datetime.fromisoformat(timestamp_str)
+                self.kill_history[service].append(timestamp)
+                self._total_kills += 1
+            except Exception as e:
+                self.log(f"Error parsing timestamp: {e}")
+    
+    def _handle_pattern(self, line):
+        """Extract resurrection patterns"""
+        match = self._pattern_re.search(line)
+        if match:
+            service, seconds = match.groups()
+            self.resurrection_patterns[service].append(int(seconds))
+            self._total_resurrections += 1
+    
+    def _handle_trigger(self, line):
+        """Extract trigger correlations"""
+        match = self._trigger_re.search(line)
+        if match:
+            service, trigger = match.groups()
+            self.trigger_correlations[(service, trigger)] += 1
+    
     def detect_new_patterns(self):
         """Detect new service name patterns based on observed kills"""
-        # Extract all service names from kill history
-        all_services = list(self.kill_history.keys())
-        
-        if len(all_services) < 3:  # Need sufficient data
+        if len(self.kill_history) < 3:  # Need sufficient data
             self.log("Not enough service data for pattern detection")
             return []
         
+        # Nothing to do unless services appeared since the last run
+        new_services = self.kill_history.keys() - self._ngram_services
+        if not new_services:
+            return []
+        
         # Find common character sequences in service names
-        new_patterns = []
+        new_patterns = set()
         try:
-            # Find common substrings
-            for service in all_services:
+            # Count each substring once per service (document frequency),
+            # only for services not already counted
+            for service in new_services:
+                self._ngram_services.add(service)
+                
+                length = len(service)
+                grams = {service[j:j+i] for i in range(NGRAM_MIN_LEN, min(length, NGRAM_MAX_LEN) + 1)
+                         for j in range(length - i + 1)}
+                self._ngram_df.update(grams)
+                
                 # Only look at services with at least one significant substring
-                if len(service) >= 5:
-                    # Try different substring lengths for pattern detection
-                    for i in range(3, min(len(service), 10)):
-                        for j in range(len(service) - i + 1):
-                            substring = service[j:j+i]
-                            # Check if this is a meaningful substring (not just digits or common words)
-                            if re.search(r'[a-zA-Z]', substring) and not substring.isdigit():
-                                # Check how many services contain this substring
-                                matching_services = [s for s in all_services if substring in s]
-                                if len(matching_services) >= 2:  # At least 2 services match
-                                    # Check if this pattern is new
-                                    pattern = f".*{re.escape(substring)}.*"
-                                    if pattern not in self.known_patterns["patterns"]:
-                                        new_patterns.append(pattern)
+                if length >= 5:
+                    # Skip substrings that are not meaningful (no letters at all)
+                    self._ngram_candidates.update(
+                        g for g in grams if len(g) < length and any(c.isalpha() for c in g)
+                    )
+            
+            # Scale the longest proposed substring to the observed service names:
+            # at most half the median name length
+            lengths = sorted(len(s) for s in self.kill_history)
+            max_len = max(NGRAM_MIN_LEN + 1, min(NGRAM_MAX_LEN, lengths[len(lengths) // 2] // 2))
             
-            # Deduplicate patterns
-            new_patterns = list(set(new_patterns))
+            # Keep substrings shared by at least 2 services
+            for substring in self._ngram_candidates:
+                if len(substring) <= max_len and self._ngram_df[substring] >= 2:
+                    # Identifier-like substrings have nothing to escape
+                    escaped = substring if substring.isidentifier() else re.escape(substring)
+                    # Check if this pattern is new
+                    pattern = f".*{escaped}.*"
+                    if pattern not in self._known_patterns_set:
+                        new_patterns.add(pattern)
             
             self.log(f"Detected {len(new_patterns)} new patterns")
-            return new_patterns
+            return list(new_patterns)
         except Exception as e:
             self.log(f"Error in pattern detection: {e}")
             return []
@@ -182,9 +322,8 @@ class AdaptiveDefenseCompanion:
             # Analyze resurrection timing patterns
             for service, times in self.resurrection_patterns.items():
                 if len(times) >= 3:
-                    avg_time = sum(times) / len(times)
                     # If service consistently resurrects at a specific interval
-                    time_variance = sum((t - avg_time) ** 2 for t in times) / len(times)
+                    avg_time, time_variance = self._mean_variance(times)
                     if time_variance < 25:  # Low variance indicates consistent pattern
                         countermeasures.append({
                             "type": "preemptive_kill",
@@ -194,9 +333,8 @@ class AdaptiveDefenseCompanion:
                         })
             
             # Analyze trigger correlations
-            for key, count in self.trigger_correlations.items():
+            for (service, trigger), count in self.trigger_correlations.items():
                 if count >= 3:  # Strong correlation
-                    service, trigger = key.split('_', 1)
                     if trigger == "screen_state_change":
                         countermeasures.append({
                             "type": "screen_state_hook",
@@ -216,6 +354,46 @@ class AdaptiveDefenseCompanion:
             self.log(f"Error generating countermeasures: {e}")
             return []
     
+    def _mean_variance(self, values):
+        """Mean and population variance in a single pass over integer samples"""
+        if np is not None and len(values) >= NUMPY_MIN_SAMPLES:
+            arr = np.fromiter(values, dtype=np.int64, count=len(values))
+            return float(arr.mean()), float(arr.var())
+        
+        n = 0
+        s1 = 0
+        s2 = 0
+        for x in values:
+            n += 1
+            s1 += x
+            s2 += x * x
+        if not n:
+            return 0.0, 0.0
+        # Integer sums are exact, so this does not suffer from cancellation
+        return s1 / n, (n * s2 - s1 * s1) / (n * n)
+    
+    def _load_existing_countermeasures(self):
+        """Return the cached countermeasures config, reloading it if the file changed"""
+        try:
+            mtime = os.stat(COUNTERMEASURE_CONFIG).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        if mtime != self._cm_mtime:
+            existing_cm = []
+            if mtime is not None:
+                try:
+                    with open(COUNTERMEASURE_CONFIG, "r") as f:
+                        existing_cm = json.load(f)
+                except:
+                    existing_cm = []
+            
+            self._existing_cm = existing_cm
+            self._existing_keys = {(cm.get("service"), cm.get("type")) for cm in existing_cm}
+            self._cm_mtime = mtime
+        
+        return self._existing_cm, self._existing_keys
+    
     def update_watchdog_configuration(self):
         """Update the watchdog configuration with new patterns and countermeasures"""
         try:
@@ -223,48 +401,53 @@ class AdaptiveDefenseCompanion:
             new_patterns = self.detect_new_patterns()
             if new_patterns:
                 self.known_patterns["patterns"].extend(new_patterns)
+                self._known_patterns_set.update(new_patterns)
                 self._save_patterns()
                 
-                # Generate pattern update file for the watchdog to pick up
-                with open(f"{CONFIG_DIR}/new_patterns.txt", "w") as f:
-                    for pattern in new_patterns:
-                        f.write(f"{pattern}\n")
-                self.log(f"Saved {len(new_patterns)} new patterns to {CONFIG_DIR}/new_patterns.txt")
+                # Generate pattern update file for the watchdog to pick up,
+                # unless it would be identical to the last one written
+                content = "".join(f"{pattern}\n" for pattern in sorted(new_patterns))
+                digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+                if digest != self._last_patterns_digest:
+                    with open(f"{CONFIG_DIR}/new_patterns.txt", "w") as f:
+                        f.write(content)
+                    self._last_patterns_digest = digest
+                    self.log(f"Saved {len(new_patterns)} new patterns to {CONFIG_DIR}/new_patterns.txt")
                 
             # Generate and deploy new countermeasures
             countermeasures = self.generate_countermeasures()
             if countermeasures:
                 # Read existing countermeasures
-                existing_cm = []
-                if os.path.exists(COUNTERMEASURE_CONFIG):
-                    try:
-                        with open(COUNTERMEASURE_CONFIG, "r") as f:
-                            existing_cm = json.load(f)
-                    except:
-                        existing_cm = []
+                existing_cm, existing_keys = self._load_existing_countermeasures()
                 
-                # Merge with new countermeasures (avoiding duplicates)
-                existing_services = set()
-                for cm in existing_cm:
-                    if "service" in cm:
-                        existing_services.add(cm["service"])
-                
-                # Add only new countermeasures
+                # Add only new countermeasures, one per service and type
+                added = 0
                 for cm in countermeasures:
-                    if "service" not in cm or cm["service"] not in existing_services:
+                    key = (cm.get("service"), cm.get("type"))
+                    if key not in existing_keys:
                         existing_cm.append(cm)
-                        if "service" in cm:
-                            existing_services.add(cm["service"])
+                        existing_keys.add(key)
+                        added += 1
                 
-                # Save updated countermeasures
-                with open(COUNTERMEASURE_CONFIG, "w") as f:
-                    json.dump(existing_cm, f, indent=2)
-                self.log(f"Updated countermeasures configuration with {len(existing_cm)} total countermeasures")
+                # Save updated countermeasures only if something was added
+                if added:
+                    self._write_json(COUNTERMEASURE_CONFIG, existing_cm)
+                    self._cm_mtime = os.stat(COUNTERMEASURE_CONFIG).st_mtime_ns
+                    self.log(f"Updated countermeasures configuration with {len(existing_cm)} total countermeasures")
         except Exception as e:
             self.log(f"Error updating watchdog configuration: {e}")
     
     def notify_user(self, message):
-        """Send a notification to the user"""
+        """Queue a notification for the user (sent by flush_notifications)"""
+        self._pending_notes.append(message)
+    
+    def flush_notifications(self):
+        """Send all queued notifications as a single alert"""
+        if not self._pending_notes:
+            return
+        
+        message = "\n".join(self._pending_notes)
+        self._pending_notes = []
         try:
             subprocess.run(["termux-notification", "--title", "Security AI Alert", "--content", message], 
                           check=True, capture_output=True)
@@ -272,15 +455,51 @@ class AdaptiveDefenseCompanion:
         except Exception as e:
             self.log(f"Error sending notification: {e}")
     
+    def _watch_log(self):
+        """Set up an inotify watch on the log directory, or None if unavailable"""
+        if inotify_simple is None:
+            return None
+        
+        try:
+            inotify = inotify_simple.INotify()
+            flags = inotify_simple.flags
+            # Watch the directory so the watch survives log rotation
+            inotify.add_watch(os.path.dirname(self.log_path) or ".",
+                              flags.MODIFY | flags.CREATE | flags.MOVED_TO)
+            return inotify
+        except OSError as e:
+            self.log(f"Log file watch unavailable, falling back to polling: {e}")
+            return None
+    
+    def _wait_for_log_activity(self, inotify, timeout):
+        """Block until the log is written to or the timeout elapses"""
+        if inotify is None:
+            time.sleep(timeout)
+            return
+        
+        log_name = os.path.basename(self.log_path)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Coalesce bursts of writes into a single wakeup
+            events = inotify.read(timeout=int(remaining * 1000), read_delay=1000)
+            if any(event.name == log_name for event in events):
+                return
+    
     def run_continuous(self, interval=300):
         """Run the companion process continuously"""
         self.log(f"Starting Adaptive Defense Companion with analysis interval of {interval} seconds")
+        inotify = self._watch_log()
         
         while True:
             try:
                 self.analyze_logs()
                 self.update_watchdog_configuration()
-                time.sleep(interval)
+                self.flush_notifications()
+                # Wake up early when the watchdog log changes
+                self._wait_for_log_activity(inotify, interval)
             except KeyboardInterrupt:
                 self.log("AI Companion stopped by user")
                 break
@@ -8,12 +8,32 @@ import json
 import sys
 import random
 import logging
+import signal
+import selectors
 import subprocess
+import shlex
+import shutil
 import threading
+import heapq
+import itertools
+import concurrent.futures
 from datetime import datetime
 import socket
+import struct
 import re
 
+# Use orjson for faster config parsing and serialization if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use inotify to pick up config changes as they happen if available
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
 # Configure paths
 BASE_DIR = "/data/data/com.termux/files/home/security_framework"
 CONFIG_DIR = f"{BASE_DIR}/config"
@@ -37,12 +57,159 @@ logging.basicConfig(
 
 logger = logging.getLogger("CountermeasureService")
 
+# Precompiled parsers for command output
+_DUMPSYS_UID_RE = re.compile(rb'userId=(\d+)')
+_PM_UID_RE = re.compile(r'uid:(\d+)')
+
+# Parsed config files keyed by path -> ((mtime_ns, size), data, raw bytes)
+_CONFIG_CACHE = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+def _load_json_cached(path):
+    """Load a JSON config file, reusing the parsed data while the file is unchanged.
+    
+    The returned data is shared with the cache and must be treated as read-only.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = _loads(raw)
+    
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE[path] = (key, data, raw)
+    return data
+
+def _loads(raw):
+    """Parse JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps(data):
+    """Serialize data to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _write_json(path, data):
+    """Write JSON atomically so readers never see a half-written file.
+    
+    Returns False without touching the file when it already holds exactly this content.
+    """
+    payload = _dumps(data)
+    
+    # Skip the write if the file is unchanged since we last read or wrote it
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[2] == payload:
+        try:
+            st = os.stat(path)
+            if cached[0] == (st.st_mtime_ns, st.st_size):
+                return False
+        except OSError:
+            pass
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    _update_config_cache(path, data, payload)
+    return True
+
+def _update_config_cache(path, data, raw):
+    """Record data just written to path so the next load skips parsing it"""
+    st = os.stat(path)
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE[path] = ((st.st_mtime_ns, st.st_size), data, raw)
+
+# Kernel socket tables covering what `netstat -tuna` reports
+PROC_NET_TABLES = ("/proc/net/tcp", "/proc/net/tcp6", "/proc/net/udp", "/proc/net/udp6")
+
+def _read_socket_inodes():
+    """Return the inodes of all TCP/UDP sockets listed in /proc/net"""
+    inodes = set()
+    for path in PROC_NET_TABLES:
+        try:
+            with open(path, "r") as f:
+                next(f, None)  # Skip the header
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 9 and fields[9] != "0":
+                        inodes.add(fields[9])
+        except OSError:
+            continue
+    return inodes
+
+# Config files checked for updates, with the attribute holding each one's last seen mtime
+CONFIG_MTIME_ATTRS = (
+    (COUNTERMEASURE_CONFIG, "last_config_mtime"),
+    (LLM_COUNTERMEASURE_CONFIG, "last_llm_config_mtime")
+)
+
+# Seconds between config checks when inotify is unavailable
+CONFIG_POLL_INTERVAL = 30
+
+# Seconds a config must stay unchanged before it is reloaded, so bursts of writes reload once
+RELOAD_DEBOUNCE = 2.0
+
+# logcat tags watched by the event-driven hooks
+APP_LAUNCH_LOGCAT_TAGS = ("am_activity_launch_time",)
+SCREEN_STATE_LOGCAT_TAGS = ("android.intent.action.SCREEN_ON", "android.intent.action.SCREEN_OFF",
+                            "android.intent.action.USER_PRESENT")
+
+# Marks the end of each command's output on the persistent adb shell
+ADB_SENTINEL = "__CM_END__"
+
+# Alphabet for random subdomain labels
+RANDOM_STRING_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+# Resolver used for DNS noise when none can be read from resolv.conf
+DEFAULT_DNS_RESOLVER = "8.8.8.8"
+
+def _find_dns_resolver():
+    """Return the first nameserver from resolv.conf, or the default resolver"""
+    for path in (f"{os.environ.get('PREFIX', '')}/etc/resolv.conf", "/etc/resolv.conf"):
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 2 and fields[0] == "nameserver" and "." in fields[1]:
+                        return fields[1]
+        except OSError:
+            continue
+    return DEFAULT_DNS_RESOLVER
+
+def _build_dns_query(name):
+    """Build a raw DNS A-record query packet for name"""
+    header = struct.pack("!HHHHHH", random.getrandbits(16), 0x0100, 1, 0, 0, 0)
+    qname = b"".join(bytes([len(label)]) + label for label in name.encode().split(b".") if label)
+    return header + qname + b"\x00\x00\x01\x00\x01"
+
 class CountermeasureService:
     def __init__(self):
         self.countermeasures = self._load_countermeasures()
         self.active_countermeasures = {}
         self.stop_event = threading.Event()
         
+        # Pending debounced config reload, if any
+        self._reload_lock = threading.Lock()
+        self._reload_entry = None
+        self._reload_deadline = 0
+        
+        # Command availability doesn't change while the service runs
+        self._command_cache = {}
+        
+        # Persistent `adb shell` session shared by all countermeasures
+        self._adb_proc = None
+        self._adb_lock = threading.Lock()
+        
         # Supported countermeasure types
         self.countermeasure_handlers = {
             "fake_location": self._deploy_fake_location,
@@ -56,6 +223,24 @@ class CountermeasureService:
             "screen_state_hook": self._deploy_screen_state_hook
         }
         
+        # Listeners sharing one logcat reader: cm_id -> (tags, match, action)
+        self._logcat_listeners = {}
+        self._logcat_lock = threading.Lock()
+        self._logcat_tags = ()
+        self._logcat_stop = None
+        
+        # Min-heap of (next_run, seq, entry) ticked by a single scheduler thread
+        self._schedule = []
+        self._schedule_seq = itertools.count()
+        self._schedule_cond = threading.Condition()
+        self._scheduler_thread = None
+        
+        # Bounded pool that runs the scheduled ticks
+        self._tick_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(32, len(self.countermeasure_handlers)),
+            thread_name_prefix="countermeasure"
+        )
+        
         logger.info("Countermeasure Service initialized")
     
     def _load_countermeasures(self):
@@ -65,9 +250,8 @@ class CountermeasureService:
         # Load main countermeasures
         if os.path.exists(COUNTERMEASURE_CONFIG):
             try:
-                with open(COUNTERMEASURE_CONFIG, "r") as f:
-                    cm = json.load(f)
-                    countermeasures.extend(cm)
+                cm = _load_json_cached(COUNTERMEASURE_CONFIG)
+                countermeasures.extend(cm)
                 logger.info(f"Loaded {len(cm)} countermeasures from main config")
             except Exception as e:
                 logger.error(f"Error loading main countermeasures: {e}")
@@ -75,9 +259,8 @@ class CountermeasureService:
         # Load LLM-generated countermeasures
         if os.path.exists(LLM_COUNTERMEASURE_CONFIG):
             try:
-                with open(LLM_COUNTERMEASURE_CONFIG, "r") as f:
-                    cm = json.load(f)
-                    countermeasures.extend(cm)
+                cm = _load_json_cached(LLM_COUNTERMEASURE_CONFIG)
+                countermeasures.extend(cm)
                 logger.info(f"Loaded {len(cm)} countermeasures from LLM config")
             except Exception as e:
                 logger.error(f"Error loading LLM countermeasures: {e}")
@@ -119,8 +302,7 @@ class CountermeasureService:
             
             # Save default countermeasures
             try:
-                with open(COUNTERMEASURE_CONFIG, "w") as f:
-                    json.dump(countermeasures, f, indent=2)
+                _write_json(COUNTERMEASURE_CONFIG, list(countermeasures))
             except Exception as e:
                 logger.error(f"Error saving default countermeasures: {e}")
         
@@ -129,9 +311,8 @@ class CountermeasureService:
     def _save_countermeasures(self):
         """Save current countermeasures to configuration file"""
         try:
-            with open(COUNTERMEASURE_CONFIG, "w") as f:
-                json.dump(self.countermeasures, f, indent=2)
-            logger.info(f"Saved {len(self.countermeasures)} countermeasures to config")
+            if _write_json(COUNTERMEASURE_CONFIG, list(self.countermeasures)):
+                logger.info(f"Saved {len(self.countermeasures)} countermeasures to config")
         except Exception as e:
             logger.error(f"Error saving countermeasures: {e}")
     
@@ -158,23 +339,23 @@ class CountermeasureService:
         
         logger.info(f"Deploying countermeasure: {cm_type}")
         
-        # Deploy the countermeasure
+        # Deploy the countermeasure; handlers do their setup and return (tick, interval, cleanup)
         handler = self.countermeasure_handlers[cm_type]
+        deployed = handler(countermeasure, cm_id)
+        if deployed is None:
+            return False
         
-        # Start the countermeasure in a separate thread
-        thread = threading.Thread(
-            target=handler,
-            args=(countermeasure, cm_id),
-            daemon=True
-        )
-        thread.start()
-        
-        # Track the active countermeasure
-        self.active_countermeasures[cm_id] = {
-            "thread": thread,
+        entry = {
+            "future": None,
             "stop_flag": threading.Event(),
             "countermeasure": countermeasure
         }
+        entry["tick"], entry["interval"], entry["cleanup"] = deployed
+        self.active_countermeasures[cm_id] = entry
+        
+        # Purely event-driven countermeasures have nothing to schedule
+        if entry["tick"] is not None:
+            self._schedule_tick(entry, time.monotonic())
         
         return True
     
@@ -182,12 +363,20 @@ class CountermeasureService:
         """Stop a running countermeasure"""
         if cm_id in self.active_countermeasures:
             logger.info(f"Stopping countermeasure: {cm_id}")
+            entry = self.active_countermeasures[cm_id]
             
-            # Signal the countermeasure to stop
-            self.active_countermeasures[cm_id]["stop_flag"].set()
+            # Signal the countermeasure to stop; pending scheduler entries are skipped lazily
+            entry["stop_flag"].set()
+            with self._schedule_cond:
+                self._schedule_cond.notify()
             
-            # Wait for thread to finish (with timeout)
-            self.active_countermeasures[cm_id]["thread"].join(timeout=5)
+            # Let an in-flight tick finish before tearing down its state
+            if entry["future"] is not None:
+                concurrent.futures.wait([entry["future"]], timeout=5)
+            try:
+                entry["cleanup"]()
+            except Exception as e:
+                logger.error(f"Error cleaning up countermeasure {cm_id}: {e}")
             
             # Remove from active countermeasures
             del self.active_countermeasures[cm_id]
@@ -196,9 +385,53 @@ class CountermeasureService:
         
         return False
     
+    def _schedule_tick(self, entry, when):
+        """Queue the next tick of a periodic countermeasure, starting the scheduler if needed"""
+        with self._schedule_cond:
+            heapq.heappush(self._schedule, (when, next(self._schedule_seq), entry))
+            
+            if self._scheduler_thread is None or not self._scheduler_thread.is_alive():
+                self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
+                self._scheduler_thread.start()
+            
+            self._schedule_cond.notify()
+    
+    def _run_scheduler(self):
+        """Dispatch periodic countermeasure ticks in deadline order"""
+        while not self.stop_event.is_set():
+            with self._schedule_cond:
+                # Drop entries for countermeasures that have been stopped
+                while self._schedule and self._schedule[0][2]["stop_flag"].is_set():
+                    heapq.heappop(self._schedule)
+                
+                if not self._schedule:
+                    self._schedule_cond.wait()
+                    continue
+                
+                delay = self._schedule[0][0] - time.monotonic()
+                if delay > 0:
+                    self._schedule_cond.wait(timeout=delay)
+                    continue
+                
+                _, _, entry = heapq.heappop(self._schedule)
+            
+            # Hand the tick to the worker pool so a slow one never delays the others;
+            # the next tick is only scheduled once this one has finished
+            entry["future"] = self._tick_pool.submit(entry["tick"])
+            entry["future"].add_done_callback(lambda future, entry=entry: self._tick_done(entry, future))
+    
+    def _tick_done(self, entry, future):
+        """Log the outcome of a countermeasure tick and schedule the next one"""
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Error in countermeasure tick: {e}")
+        
+        if not entry["stop_flag"].is_set():
+            self._schedule_tick(entry, time.monotonic() + entry["interval"])
+    
     def _deploy_fake_location(self, cm, cm_id):
         """Deploy fake location countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         params = cm.get("params", {})
         
         interval = params.get("interval", 300)
@@ -207,35 +440,35 @@ class CountermeasureService:
         
         logger.info(f"Starting fake location deployment (lat={lat}, lon={lon}, interval={interval}s)")
         
-        while not stop_flag.is_set():
+        have_termux = self._has_command("termux-location")
+        have_adb = self._has_command("adb")
+        
+        # Enable mock locations in developer options; the setting persists, so once is enough
+        if have_adb:
+            self._adb_shell("settings", "put", "secure", "mock_location", "1")
+        
+        def tick():
+            nonlocal lat, lon
             try:
                 # Try using Termux API if available
-                if self._has_command("termux-location"):
+                if have_termux:
                     # Request fake location
                     logger.debug("Setting fake location via Termux API")
                     subprocess.run(
                         ["termux-location", "-p", "network"],
                         check=False,
-                        capture_output=True
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
                     )
                 
                 # Try using ADB if available
-                if self._has_command("adb"):
+                if have_adb:
                     # Set mock location via ADB
                     logger.debug("Setting fake location via ADB")
-                    subprocess.run(
-                        ["adb", "shell", "am", "broadcast", "-a", "com.android.intent.action.SET_MOCK_LOCATION",
-                         "--ei", "latitude", str(int(lat * 1e6)), 
-                         "--ei", "longitude", str(int(lon * 1e6))],
-                        check=False,
-                        capture_output=True
-                    )
-                    
-                    # Enable mock locations in developer options
-                    subprocess.run(
-                        ["adb", "shell", "settings", "put", "secure", "mock_location", "1"],
-                        check=False,
-                        capture_output=True
+                    self._adb_shell(
+                        "am", "broadcast", "-a", "com.android.intent.action.SET_MOCK_LOCATION",
+                        "--ei", "latitude", str(int(lat * 1e6)),
+                        "--ei", "longitude", str(int(lon * 1e6))
                     )
                 
                 # Randomize location slightly each time
@@ -245,16 +478,14 @@ class CountermeasureService:
                 logger.debug(f"Deployed fake location: {lat}, {lon}")
             except Exception as e:
                 logger.error(f"Error in fake location countermeasure: {e}")
-            
-            # Wait for next interval or until stopped
-            if stop_flag.wait(timeout=interval):
-                break
         
-        logger.info("Fake location countermeasure stopped")
+        def cleanup():
+            logger.info("Fake location countermeasure stopped")
+        
+        return tick, interval, cleanup
     
     def _deploy_sensor_flooding(self, cm, cm_id):
         """Deploy sensor flooding countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         params = cm.get("params", {})
         
         interval = params.get("interval", 60)
@@ -262,37 +493,39 @@ class CountermeasureService:
         
         logger.info(f"Starting sensor flooding for {sensors}")
         
-        while not stop_flag.is_set():
+        have_termux = self._has_command("termux-sensor")
+        
+        def tick():
             try:
-                if self._has_command("termux-sensor"):
+                if have_termux:
                     # Use Termux API to flood sensors with random data
                     for sensor in sensors:
                         # Get current sensor data and then cancel
                         subprocess.run(
                             ["termux-sensor", "-s", sensor, "-d", "100", "-n", "1"],
                             check=False,
-                            capture_output=True
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL
                         )
                         time.sleep(0.2)
                         subprocess.run(
                             ["termux-sensor", "-c"],
                             check=False,
-                            capture_output=True
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL
                         )
                 
                 logger.debug(f"Deployed sensor flooding for {sensors}")
             except Exception as e:
                 logger.error(f"Error in sensor flooding countermeasure: {e}")
-            
-            # Wait for next interval or until stopped
-            if stop_flag.wait(timeout=interval):
-                break
         
-        logger.info("Sensor flooding countermeasure stopped")
+        def cleanup():
+            logger.info("Sensor flooding countermeasure stopped")
+        
+        return tick, interval, cleanup
     
     def _deploy_network_noise(self, cm, cm_id):
         """Deploy network noise countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         params = cm.get("params", {})
         
         interval = params.get("interval", 600)
@@ -300,95 +533,88 @@ class CountermeasureService:
         
         logger.info(f"Starting network noise generation")
         
-        while not stop_flag.is_set():
+        resolver = _find_dns_resolver()
+        addresses = []
+        
+        # One non-blocking UDP socket carries every fake DNS query for this deployment
+        dns_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dns_sock.setblocking(False)
+        
+        def tick():
             try:
-                # Generate fake DNS requests
+                # Resolve targets once (retrying until the network is up) so
+                # the per-tick work never blocks on DNS
+                if not addresses:
+                    for domain in domains:
+                        try:
+                            addresses.append(socket.gethostbyname(domain))
+                        except OSError:
+                            logger.debug(f"Could not resolve noise domain {domain}")
+                
+                # Generate fake DNS requests, fire-and-forget
                 for _ in range(random.randint(3, 8)):
                     domain = random.choice(domains)
                     subdomain = f"{self._random_string(8)}.{domain}"
                     
                     try:
-                        # Just resolve the domain
-                        socket.gethostbyname(subdomain)
-                    except:
+                        dns_sock.sendto(_build_dns_query(subdomain), (resolver, 53))
+                    except OSError:
                         pass
                 
-                # Generate fake HTTP requests (without actually connecting)
-                for _ in range(random.randint(2, 5)):
-                    domain = random.choice(domains)
-                    path = f"/{self._random_string(6)}/{self._random_string(8)}.html"
-                    
-                    # Create socket but don't actually send data
-                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    s.settimeout(0.1)
-                    try:
-                        s.connect((domain, 80))
-                    except:
-                        pass
-                    finally:
-                        s.close()
+                # Generate fake HTTP connection attempts (SYN only, never wait)
+                if addresses:
+                    for _ in range(random.randint(2, 5)):
+                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                            s.setblocking(False)
+                            s.connect_ex((random.choice(addresses), 80))
                 
                 logger.debug(f"Generated network noise")
             except Exception as e:
                 logger.error(f"Error in network noise countermeasure: {e}")
-            
-            # Wait for next interval or until stopped
-            if stop_flag.wait(timeout=interval):
-                break
         
-        logger.info("Network noise countermeasure stopped")
+        def cleanup():
+            dns_sock.close()
+            logger.info("Network noise countermeasure stopped")
+        
+        return tick, interval, cleanup
     
     def _deploy_preemptive_kill(self, cm, cm_id):
         """Deploy preemptive kill countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         interval = cm.get("interval", 30)
         
         if not service:
             logger.error("Preemptive kill missing service name")
-            return
+            return None
         
         logger.info(f"Starting preemptive kill for {service} every {interval}s")
         
-        while not stop_flag.is_set():
+        needle = service.encode()
+        
+        def tick():
             try:
                 # Find and kill the service
-                output = subprocess.check_output(
-                    ["ps", "-ef"], 
-                    text=True
-                )
-                
-                for line in output.splitlines():
-                    if service in line and "grep" not in line:
-                        # Extract PID
-                        pid = re.findall(r'\s+(\d+)\s+', line)
-                        if pid:
-                            pid = pid[0]
-                            # Kill the process
-                            subprocess.run(
-                                ["kill", "-9", pid],
-                                check=False,
-                                capture_output=True
-                            )
-                            logger.debug(f"Preemptively killed {service} (PID: {pid})")
-                
+                for pid, cmdline in self._iter_procs():
+                    if needle in cmdline:
+                        # Kill the process
+                        self._kill(pid)
+                        logger.debug(f"Preemptively killed {service} (PID: {pid})")
+            
             except Exception as e:
                 logger.error(f"Error in preemptive kill countermeasure: {e}")
-            
-            # Wait for next interval or until stopped
-            if stop_flag.wait(timeout=interval):
-                break
         
-        logger.info(f"Preemptive kill countermeasure for {service} stopped")
+        def cleanup():
+            logger.info(f"Preemptive kill countermeasure for {service} stopped")
+        
+        return tick, interval, cleanup
     
     def _deploy_service_blocker(self, cm, cm_id):
         """Deploy service blocker countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         
         if not service:
             logger.error("Service blocker missing service name")
-            return
+            return None
         
         logger.info(f"Starting service blocker for {service}")
         
@@ -405,18 +631,10 @@ class CountermeasureService:
                 if self._has_command("adb"):
                     # Try to disable the package if possible
                     logger.info(f"Attempting to disable package {package_name}")
-                    subprocess.run(
-                        ["adb", "shell", "pm", "disable-user", "--user", "0", package_name],
-                        check=False,
-                        capture_output=True
-                    )
+                    self._adb_shell("pm", "disable-user", "--user", "0", package_name)
                     
                     # Force stop the package
-                    subprocess.run(
-                        ["adb", "shell", "am", "force-stop", package_name],
-                        check=False,
-                        capture_output=True
-                    )
+                    self._adb_shell("am", "force-stop", package_name)
                     
                     logger.info(f"Disabled package {package_name}")
             except Exception as e:
@@ -424,45 +642,33 @@ class CountermeasureService:
         
         # Monitor for service launches continuously
         logger.info(f"Monitoring for {service} launches")
-        while not stop_flag.is_set():
+        needle = service.encode()
+        
+        def tick():
             try:
                 # Find and kill the service continuously
-                output = subprocess.check_output(
-                    ["ps", "-ef"], 
-                    text=True
-                )
-                
-                for line in output.splitlines():
-                    if service in line and "grep" not in line:
-                        # Extract PID
-                        pid = re.findall(r'\s+(\d+)\s+', line)
-                        if pid:
-                            pid = pid[0]
-                            # Kill the process
-                            subprocess.run(
-                                ["kill", "-9", pid],
-                                check=False,
-                                capture_output=True
-                            )
-                            logger.debug(f"Blocked service {service} (PID: {pid})")
-                
+                for pid, cmdline in self._iter_procs():
+                    if needle in cmdline:
+                        # Kill the process
+                        self._kill(pid)
+                        logger.debug(f"Blocked service {service} (PID: {pid})")
+            
             except Exception as e:
                 logger.error(f"Error in service blocker countermeasure: {e}")
-            
-            # Short interval for monitoring
-            if stop_flag.wait(timeout=5):
-                break
         
-        logger.info(f"Service blocker for {service} stopped")
+        def cleanup():
+            logger.info(f"Service blocker for {service} stopped")
+        
+        # Short interval for monitoring
+        return tick, 5, cleanup
     
     def _deploy_network_block(self, cm, cm_id):
         """Deploy network blocking countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         
         if not service:
             logger.error("Network block missing service name")
-            return
+            return None
         
         logger.info(f"Starting network blocking for {service}")
         
@@ -473,7 +679,11 @@ class CountermeasureService:
             if len(package_parts) >= 2:
                 package_name = ".".join(package_parts[:-1])
         
-        if self._has_command("iptables") and package_name:
+        use_iptables = package_name is not None and self._has_command("iptables")
+        uid = None
+        
+        def block_app_traffic():
+            nonlocal uid
             try:
                 # Try to block network access for the app using iptables
                 uid = self._get_app_uid(package_name)
@@ -482,69 +692,68 @@ class CountermeasureService:
                     subprocess.run(
                         ["iptables", "-A", "OUTPUT", "-m", "owner", "--uid-owner", str(uid), "-j", "DROP"],
                         check=False,
-                        capture_output=True
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
                     )
                     logger.info(f"Blocked network traffic for {package_name} (UID: {uid})")
             except Exception as e:
                 logger.error(f"Error setting up network block: {e}")
         
         # Monitor network connections continuously
-        while not stop_flag.is_set():
+        needle = service.encode()
+        
+        def tick():
+            nonlocal use_iptables
+            # The UID lookup forks dumpsys/pm, so do it on the first tick in the
+            # worker pool rather than holding up the deploy
+            if use_iptables:
+                use_iptables = False
+                block_app_traffic()
+            
             try:
                 # Check for network connections from the service
-                if self._has_command("netstat"):
-                    output = subprocess.check_output(
-                        ["netstat", "-tunap"], 
-                        text=True
-                    )
-                    
-                    for line in output.splitlines():
-                        if service in line:
-                            # Extract PID if possible
-                            pid_match = re.search(r'(\d+)/\S+', line)
-                            if pid_match:
-                                pid = pid_match.group(1)
-                                
-                                # Kill the connection
-                                subprocess.run(
-                                    ["kill", "-9", pid],
-                                    check=False,
-                                    capture_output=True
-                                )
-                                logger.debug(f"Terminated network connection from {service} (PID: {pid})")
+                inodes = None
+                for pid, cmdline in self._iter_procs():
+                    if needle in cmdline:
+                        # Only read the socket tables once a candidate shows up
+                        if inodes is None:
+                            inodes = _read_socket_inodes()
+                        
+                        if self._pid_has_socket(pid, inodes):
+                            # Kill the connection
+                            self._kill(pid)
+                            logger.debug(f"Terminated network connection from {service} (PID: {pid})")
             
             except Exception as e:
                 logger.error(f"Error in network blocking monitor: {e}")
-            
-            # Short interval for monitoring
-            if stop_flag.wait(timeout=5):
-                break
         
-        # Clean up iptables rules if needed
-        if self._has_command("iptables") and package_name:
-            try:
-                uid = self._get_app_uid(package_name)
-                if uid:
+        def cleanup():
+            # Clean up the iptables rule added on the first tick, if any
+            if uid:
+                try:
                     # Remove the blocking rule
                     subprocess.run(
                         ["iptables", "-D", "OUTPUT", "-m", "owner", "--uid-owner", str(uid), "-j", "DROP"],
                         check=False,
-                        capture_output=True
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
                     )
                     logger.info(f"Removed network block for {package_name}")
-            except Exception as e:
-                logger.error(f"Error removing network block: {e}")
+                except Exception as e:
+                    logger.error(f"Error removing network block: {e}")
+            
+            logger.info(f"Network blocking for {service} stopped")
         
-        logger.info(f"Network blocking for {service} stopped")
+        # Short interval for monitoring
+        return tick, 5, cleanup
     
     def _deploy_service_isolation(self, cm, cm_id):
         """Deploy service isolation countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         
         if not service:
             logger.error("Service isolation missing service name")
-            return
+            return None
         
         logger.info(f"Starting service isolation for {service}")
         
@@ -562,217 +771,282 @@ class CountermeasureService:
         if package_name and self._has_command("adb"):
             try:
                 # Force stop the package
-                subprocess.run(
-                    ["adb", "shell", "am", "force-stop", package_name],
-                    check=False,
-                    capture_output=True
-                )
+                self._adb_shell("am", "force-stop", package_name)
                 
                 # Clear app data
-                subprocess.run(
-                    ["adb", "shell", "pm", "clear", package_name],
-                    check=False,
-                    capture_output=True
-                )
+                self._adb_shell("pm", "clear", package_name)
                 
                 logger.info(f"Isolated package {package_name}")
             except Exception as e:
                 logger.error(f"Error isolating package: {e}")
         
         # Monitor for service activity continuously
-        while not stop_flag.is_set():
+        needle = service.encode()
+        
+        def tick():
             try:
                 # Find and kill the service
-                output = subprocess.check_output(
-                    ["ps", "-ef"], 
-                    text=True
-                )
-                
-                for line in output.splitlines():
-                    if service in line and "grep" not in line:
-                        # Extract PID
-                        pid = re.findall(r'\s+(\d+)\s+', line)
-                        if pid:
-                            pid = pid[0]
-                            # Kill the process
-                            subprocess.run(
-                                ["kill", "-9", pid],
-                                check=False,
-                                capture_output=True
-                            )
-                            logger.debug(f"Terminated isolated service {service} (PID: {pid})")
+                for pid, cmdline in self._iter_procs():
+                    if needle in cmdline:
+                        # Kill the process
+                        self._kill(pid)
+                        logger.debug(f"Terminated isolated service {service} (PID: {pid})")
             
             except Exception as e:
                 logger.error(f"Error in service isolation monitoring: {e}")
-            
-            # Short interval for monitoring
-            if stop_flag.wait(timeout=5):
-                break
         
-        logger.info(f"Service isolation for {service} stopped")
+        def cleanup():
+            logger.info(f"Service isolation for {service} stopped")
+        
+        # Short interval for monitoring
+        return tick, 5, cleanup
     
     def _deploy_app_launch_hook(self, cm, cm_id):
         """Deploy app launch hook countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         
         if not service:
             logger.error("App launch hook missing service name")
-            return
+            return None
         
         logger.info(f"Starting app launch hook for {service}")
         
         # This requires special permissions to monitor app launches
         # For now, we'll use a simplified approach using logcat if available
         
+        def cleanup():
+            self._remove_logcat_listener(cm_id)
+            logger.info(f"App launch hook for {service} stopped")
+        
         if self._has_command("logcat"):
-            try:
-                # Start logcat process to monitor app launches
-                logcat_proc = subprocess.Popen(
-                    ["logcat", "-b", "events", "-v", "raw", "-s", "am_activity_launch_time"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                # Monitor logcat output for app launches
-                while not stop_flag.is_set():
-                    line = logcat_proc.stdout.readline().strip()
-                    if line:
-                        # Check if our target service might be starting
-                        if "ActivityManager" in line and "start" in line:
-                            logger.debug(f"Detected activity start: {line}")
-                            
-                            # Immediately check and kill the service
-                            self._find_and_kill_service(service)
-                
-                # Clean up logcat process
-                logcat_proc.terminate()
-                try:
-                    logcat_proc.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    logcat_proc.kill()
-            
-            except Exception as e:
-                logger.error(f"Error in app launch hook: {e}")
-        else:
-            # Fallback to periodic checking
-            logger.warning("Logcat not available, falling back to periodic checking")
+            def is_launch(line):
+                # Check if our target service might be starting
+                return "ActivityManager" in line and "start" in line
             
-            while not stop_flag.is_set():
-                self._find_and_kill_service(service)
+            def on_launch(line):
+                logger.debug(f"Detected activity start: {line}")
                 
-                # Check periodically
-                if stop_flag.wait(timeout=5):
-                    break
+                # Immediately check and kill the service
+                self._find_and_kill_service(service)
+            
+            self._add_logcat_listener(cm_id, APP_LAUNCH_LOGCAT_TAGS, is_launch, on_launch)
+            return None, None, cleanup
         
-        logger.info(f"App launch hook for {service} stopped")
+        # Fallback to periodic checking
+        logger.warning("Logcat not available, falling back to periodic checking")
+        return lambda: self._find_and_kill_service(service), 5, cleanup
     
     def _deploy_screen_state_hook(self, cm, cm_id):
         """Deploy screen state hook countermeasure"""
-        stop_flag = self.active_countermeasures[cm_id]["stop_flag"]
         service = cm.get("service")
         
         if not service:
             logger.error("Screen state hook missing service name")
-            return
+            return None
         
         logger.info(f"Starting screen state hook for {service}")
         
         # This requires special permissions to monitor screen state
         # For now, we'll use a simplified approach using logcat if available
         
+        def cleanup():
+            self._remove_logcat_listener(cm_id)
+            logger.info(f"Screen state hook for {service} stopped")
+        
         if self._has_command("logcat"):
-            try:
-                # Start logcat process to monitor screen state changes
-                logcat_proc = subprocess.Popen(
-                    ["logcat", "-b", "events", "-v", "raw", "-s", "android.intent.action.SCREEN_ON", 
-                     "android.intent.action.SCREEN_OFF", "android.intent.action.USER_PRESENT"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
+            def is_screen_on(line):
+                # Check for screen state change events
+                return "SCREEN_ON" in line or "USER_PRESENT" in line
+            
+            def on_screen_on(line):
+                logger.debug(f"Detected screen state change: {line}")
                 
-                # Monitor logcat output for screen state changes
-                while not stop_flag.is_set():
-                    line = logcat_proc.stdout.readline().strip()
-                    if line:
-                        # Check for screen state change events
-                        if "SCREEN_ON" in line or "USER_PRESENT" in line:
-                            logger.debug(f"Detected screen state change: {line}")
-                            
-                            # Wait a moment for services to start
-                            time.sleep(1)
-                            
-                            # Check multiple times after screen change
-                            for _ in range(5):
-                                self._find_and_kill_service(service)
-                                time.sleep(1)
+                # Wait a moment for services to start
+                time.sleep(1)
                 
-                # Clean up logcat process
-                logcat_proc.terminate()
-                try:
-                    logcat_proc.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    logcat_proc.kill()
-            
-            except Exception as e:
-                logger.error(f"Error in screen state hook: {e}")
-        else:
-            # Fallback to periodic checking
-            logger.warning("Logcat not available, falling back to periodic checking")
+                # Check multiple times after screen change
+                for _ in range(5):
+                    self._find_and_kill_service(service)
+                    time.sleep(1)
             
+            self._add_logcat_listener(cm_id, SCREEN_STATE_LOGCAT_TAGS, is_screen_on, on_screen_on)
+            return None, None, cleanup
+        
+        # Fallback to periodic checking
+        logger.warning("Logcat not available, falling back to periodic checking")
+        return lambda: self._find_and_kill_service(service), 5, cleanup
+    
+    def _add_logcat_listener(self, cm_id, tags, match, action):
+        """Subscribe to the shared logcat reader; action runs on the tick pool for matching lines"""
+        with self._logcat_lock:
+            self._logcat_listeners[cm_id] = (tags, match, action)
+            self._restart_logcat_reader()
+    
+    def _remove_logcat_listener(self, cm_id):
+        """Unsubscribe from the shared logcat reader, stopping it when nobody is left"""
+        with self._logcat_lock:
+            if self._logcat_listeners.pop(cm_id, None) is not None:
+                self._restart_logcat_reader()
+    
+    def _restart_logcat_reader(self):
+        """Make sure a single logcat reader is running with the union of all listener tags"""
+        tags = tuple(sorted({tag for listener_tags, _, _ in self._logcat_listeners.values() for tag in listener_tags}))
+        if tags == self._logcat_tags and self._logcat_stop is not None:
+            return
+        
+        # Stop the current reader; a new one is started if its tag set changed
+        if self._logcat_stop is not None:
+            self._logcat_stop.set()
+            self._logcat_stop = None
+        self._logcat_tags = tags
+        
+        if tags:
+            self._logcat_stop = threading.Event()
+            threading.Thread(target=self._run_logcat_reader, args=(tags, self._logcat_stop), daemon=True).start()
+    
+    def _run_logcat_reader(self, tags, stop_flag):
+        """Stream logcat for the given tags and dispatch lines to the matching listeners"""
+        try:
+            # Start one logcat process covering every active hook
+            logcat_proc = subprocess.Popen(
+                ["logcat", "-b", "events", "-v", "raw", "-s", *tags],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except Exception as e:
+            logger.error(f"Error starting logcat: {e}")
+            return
+        
+        try:
+            for line in self._iter_logcat_lines(logcat_proc, stop_flag):
+                if not line:
+                    continue
+                
+                with self._logcat_lock:
+                    listeners = list(self._logcat_listeners.values())
+                for _, match, action in listeners:
+                    if match(line):
+                        self._tick_pool.submit(action, line)
+        
+        except Exception as e:
+            logger.error(f"Error in logcat reader: {e}")
+        finally:
+            # Clean up logcat process
+            logcat_proc.terminate()
+            try:
+                logcat_proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                logcat_proc.kill()
+    
+    def _iter_logcat_lines(self, logcat_proc, stop_flag):
+        """Yield logcat lines as they arrive, waking up regularly to honor stop_flag"""
+        fd = logcat_proc.stdout.fileno()
+        os.set_blocking(fd, False)
+        buf = b""
+        
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
             while not stop_flag.is_set():
-                self._find_and_kill_service(service)
+                if not sel.select(timeout=0.5):
+                    continue
                 
-                # Check periodically
-                if stop_flag.wait(timeout=5):
+                # Drain everything that is available in one read
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    # logcat exited
                     break
-        
-        logger.info(f"Screen state hook for {service} stopped")
+                
+                buf += data
+                *lines, buf = buf.split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", "replace").strip()
+                    if stop_flag.is_set():
+                        return
     
     def _find_and_kill_service(self, service):
         """Helper function to find and kill a service"""
         try:
-            output = subprocess.check_output(
-                ["ps", "-ef"], 
-                text=True
-            )
-            
-            for line in output.splitlines():
-                if service in line and "grep" not in line:
-                    # Extract PID
-                    pid = re.findall(r'\s+(\d+)\s+', line)
-                    if pid:
-                        pid = pid[0]
-                        # Kill the process
-                        subprocess.run(
-                            ["kill", "-9", pid],
-                            check=False,
-                            capture_output=True
-                        )
-                        logger.debug(f"Killed service {service} (PID: {pid})")
-                        return True
+            needle = service.encode()
+            for pid, cmdline in self._iter_procs():
+                if needle in cmdline:
+                    # Kill the process
+                    self._kill(pid)
+                    logger.debug(f"Killed service {service} (PID: {pid})")
+                    return True
         
         except Exception as e:
             logger.error(f"Error finding and killing service: {e}")
         
         return False
     
+    def _kill(self, pid):
+        """Send SIGKILL to a process, returning whether it was delivered"""
+        try:
+            os.kill(pid, signal.SIGKILL)
+            return True
+        except ProcessLookupError:
+            # Already gone
+            return False
+        except PermissionError as e:
+            logger.debug(f"Not permitted to kill PID {pid}: {e}")
+            return False
+    
+    def _pid_has_socket(self, pid, inodes):
+        """Check whether a process holds an fd for any of the given socket inodes"""
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            return False
+        
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            if target.startswith("socket:[") and target[8:-1] in inodes:
+                return True
+        
+        return False
+    
+    def _iter_procs(self):
+        """Yield (pid, cmdline) for every other running process, read directly from /proc"""
+        own_pid = str(os.getpid())
+        for name in os.listdir("/proc"):
+            if not name.isdigit() or name == own_pid:
+                continue
+            try:
+                with open(f"/proc/{name}/cmdline", "rb") as f:
+                    cmdline = f.read()
+            except OSError:
+                # Process exited or is not accessible
+                continue
+            yield int(name), cmdline.replace(b"\0", b" ")
+    
     def _get_app_uid(self, package_name):
         """Get the UID for an app package"""
         try:
             # Try using 'dumpsys' command
             if self._has_command("dumpsys"):
-                output = subprocess.check_output(
-                    ["dumpsys", "package", package_name], 
-                    text=True
+                dumpsys_proc = subprocess.Popen(
+                    ["dumpsys", "package", package_name],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
                 )
                 
-                # Extract UID
-                uid_match = re.search(r'userId=(\d+)', output)
-                if uid_match:
-                    return uid_match.group(1)
+                # Extract UID, stopping dumpsys as soon as it has been printed
+                try:
+                    for line in dumpsys_proc.stdout:
+                        uid_match = _DUMPSYS_UID_RE.search(line)
+                        if uid_match:
+                            return uid_match.group(1).decode()
+                finally:
+                    dumpsys_proc.kill()
+                    dumpsys_proc.wait()
+                    dumpsys_proc.stdout.close()
             
             # Try using 'pm' via ADB
             if self._has_command("adb"):
@@ -782,7 +1056,7 @@ class CountermeasureService:
                 )
                 
                 # Extract UID
-                uid_match = re.search(r'uid:(\d+)', output)
+                uid_match = _PM_UID_RE.search(output)
                 if uid_match:
                     return uid_match.group(1)
         
@@ -791,93 +1065,210 @@ class CountermeasureService:
         
         return None
     
+    def _adb_shell(self, *args):
+        """Run a command over the persistent adb shell session, returning (exit status, output)"""
+        command = " ".join(shlex.quote(str(arg)) for arg in args)
+        
+        with self._adb_lock:
+            try:
+                if self._adb_proc is None or self._adb_proc.poll() is not None:
+                    self._adb_proc = subprocess.Popen(
+                        ["adb", "shell"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL
+                    )
+                
+                # Terminate every command with a sentinel carrying its exit status
+                self._adb_proc.stdin.write(f"{command}; echo {ADB_SENTINEL}$?\n".encode())
+                self._adb_proc.stdin.flush()
+                
+                output = []
+                for line in self._adb_proc.stdout:
+                    marker = line.find(ADB_SENTINEL.encode())
+                    if marker != -1:
+                        output.append(line[:marker])
+                        status = int(line[marker + len(ADB_SENTINEL):].strip() or -1)
+                        return status, b"".join(output).decode("utf-8", "replace")
+                    output.append(line)
+                
+                # Session ended before the sentinel arrived
+                logger.error(f"adb shell session closed while running: {command}")
+            except Exception as e:
+                logger.error(f"Error running adb shell command: {e}")
+            
+            self._close_adb_shell()
+            return None, ""
+    
+    def _close_adb_shell(self):
+        """Tear down the persistent adb shell session if one is open"""
+        proc, self._adb_proc = self._adb_proc, None
+        if proc is None:
+            return
+        
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    
     def _has_command(self, cmd):
-        """Check if a command is available"""
-        return subprocess.call(["which", cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+        """Check if a command is available, probing PATH only once per command"""
+        available = self._command_cache.get(cmd)
+        if available is None:
+            available = shutil.which(cmd) is not None
+            self._command_cache[cmd] = available
+        return available
     
     def _random_string(self, length):
         """Generate a random string"""
-        chars = "abcdefghijklmnopqrstuvwxyz0123456789"
-        return ''.join(random.choice(chars) for _ in range(length))
+        return ''.join(random.choices(RANDOM_STRING_CHARS, k=length))
     
     def check_for_updates(self):
         """Check for updated countermeasures"""
         try:
-            # Check if countermeasures config has been modified
-            if os.path.exists(COUNTERMEASURE_CONFIG):
-                current_mtime = os.path.getmtime(COUNTERMEASURE_CONFIG)
+            # Stamp each config's mtime, noting whether any changed since the last check
+            need_reload = False
+            for path, attr in CONFIG_MTIME_ATTRS:
+                try:
+                    current_mtime = os.stat(path).st_mtime
+                except FileNotFoundError:
+                    continue
                 
-                if hasattr(self, 'last_config_mtime') and current_mtime > self.last_config_mtime:
-                    logger.info("Countermeasure configuration has been updated")
-                    
-                    # Reload countermeasures
-                    self.countermeasures = self._load_countermeasures()
-                    
-                    # Restart active countermeasures
-                    self.stop_all_countermeasures()
-                    self.deploy_countermeasures()
+                last_mtime = getattr(self, attr, None)
+                if last_mtime is not None and current_mtime > last_mtime:
+                    logger.info(f"Countermeasure configuration {os.path.basename(path)} has been updated")
+                    need_reload = True
                 
                 # Update last modification time
-                self.last_config_mtime = current_mtime
+                setattr(self, attr, current_mtime)
             
-            # Check LLM countermeasures as well
-            if os.path.exists(LLM_COUNTERMEASURE_CONFIG):
-                current_mtime = os.path.getmtime(LLM_COUNTERMEASURE_CONFIG)
-                
-                if hasattr(self, 'last_llm_config_mtime') and current_mtime > self.last_llm_config_mtime:
-                    logger.info("LLM countermeasure configuration has been updated")
-                    
-                    # Reload countermeasures
-                    self.countermeasures = self._load_countermeasures()
-                    
-                    # Restart active countermeasures
-                    self.stop_all_countermeasures()
-                    self.deploy_countermeasures()
-                
-                # Update last modification time
-                self.last_llm_config_mtime = current_mtime
+            if need_reload:
+                self._request_reload()
         
         except Exception as e:
             logger.error(f"Error checking for updates: {e}")
     
+    def _request_reload(self):
+        """Schedule a reload once config changes have settled, pushing back any pending one"""
+        with self._reload_lock:
+            self._reload_deadline = time.monotonic() + RELOAD_DEBOUNCE
+            if self._reload_entry is not None:
+                return
+            
+            self._reload_entry = {
+                "future": None,
+                "stop_flag": threading.Event(),
+                "tick": self._reload_when_settled,
+                "interval": RELOAD_DEBOUNCE
+            }
+            self._schedule_tick(self._reload_entry, self._reload_deadline)
+    
+    def _reload_when_settled(self):
+        """Reload and redeploy countermeasures if no further changes arrived during the debounce window"""
+        with self._reload_lock:
+            entry = self._reload_entry
+            remaining = self._reload_deadline - time.monotonic()
+            if remaining > 0:
+                # More changes came in; check again when the window closes
+                entry["interval"] = remaining
+                return
+            
+            # One-shot: retire this entry so the next change schedules a fresh reload
+            entry["stop_flag"].set()
+            self._reload_entry = None
+        
+        # Reload countermeasures
+        self.countermeasures = self._load_countermeasures()
+        
+        # Restart active countermeasures
+        self.stop_all_countermeasures()
+        self.deploy_countermeasures()
+    
+    def _watch_configs(self):
+        """Set up an inotify watch on the config directories, or None if unavailable"""
+        if inotify_simple is None:
+            return None
+        
+        try:
+            inotify = inotify_simple.INotify()
+            flags = inotify_simple.flags
+            # Watch the directories so atomic replacements are seen too
+            for directory in {os.path.dirname(COUNTERMEASURE_CONFIG), os.path.dirname(LLM_COUNTERMEASURE_CONFIG)}:
+                inotify.add_watch(directory, flags.CLOSE_WRITE | flags.MOVED_TO)
+            return inotify
+        except OSError as e:
+            logger.warning(f"Config watch unavailable, falling back to polling: {e}")
+            return None
+    
+    def _watch_config_changes(self, inotify):
+        """Check for updates whenever one of the config files is rewritten"""
+        names = {os.path.basename(COUNTERMEASURE_CONFIG), os.path.basename(LLM_COUNTERMEASURE_CONFIG)}
+        
+        while not self.stop_event.is_set():
+            try:
+                events = inotify.read()
+                if any(event.name in names for event in events):
+                    self.check_for_updates()
+            except Exception as e:
+                logger.error(f"Error watching config files: {e}")
+                self.stop_event.wait(timeout=30)  # Error backoff
+    
     def stop_all_countermeasures(self):
         """Stop all active countermeasures"""
         logger.info("Stopping all active countermeasures")
         
         # Make a copy of the keys, as we'll modify the dictionary
         cm_ids = list(self.active_countermeasures.keys())
+        if not cm_ids:
+            return
         
-        for cm_id in cm_ids:
-            self._stop_countermeasure(cm_id)
+        # Stop them concurrently so in-flight ticks and cleanup commands overlap
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(cm_ids))) as executor:
+            list(executor.map(self._stop_countermeasure, cm_ids))
     
     def run(self):
         """Run the countermeasure service"""
         logger.info("Starting Countermeasure Service")
         
         # Initial configuration
-        if os.path.exists(COUNTERMEASURE_CONFIG):
-            self.last_config_mtime = os.path.getmtime(COUNTERMEASURE_CONFIG)
-        
-        if os.path.exists(LLM_COUNTERMEASURE_CONFIG):
-            self.last_llm_config_mtime = os.path.getmtime(LLM_COUNTERMEASURE_CONFIG)
+        for path, attr in CONFIG_MTIME_ATTRS:
+            try:
+                setattr(self, attr, os.stat(path).st_mtime)
+            except FileNotFoundError:
+                pass
         
         # Deploy initial countermeasures
         self.deploy_countermeasures()
         
+        # Reload on config change events rather than polling when possible
+        inotify = self._watch_configs()
+        if inotify is not None:
+            threading.Thread(target=self._watch_config_changes, args=(inotify,), daemon=True).start()
+        else:
+            # Poll for configuration updates as a tick on the shared scheduler
+            update_entry = {
+                "future": None,
+                "stop_flag": threading.Event(),
+                "tick": self.check_for_updates,
+                "interval": CONFIG_POLL_INTERVAL
+            }
+            self._schedule_tick(update_entry, time.monotonic() + CONFIG_POLL_INTERVAL)
+        
         try:
-            # Main service loop
-            while not self.stop_event.is_set():
-                # Check for configuration updates
-                self.check_for_updates()
-                
-                # Wait for a while before checking again
-                self.stop_event.wait(timeout=30)
-                
+            # All work happens on the scheduler, watcher and logcat threads
+            self.stop_event.wait()
         except KeyboardInterrupt:
             logger.info("Countermeasure Service stopped by user")
         finally:
             # Clean up
             self.stop_all_countermeasures()
+            with self._adb_lock:
+                self._close_adb_shell()
+            self._tick_pool.shutdown(wait=False)
             logger.info("Countermeasure Service stopped")
 
 if __name__ == "__main__":